@@ -1,8 +1,12 @@
 # v2
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from typing import List, Optional, Tuple
-import os, re, uuid, tempfile, shutil, requests, base64
+from fastapi import FastAPI, HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, ValidationError
+from typing import Callable, Dict, List, Optional, Tuple
+import os, re, uuid, tempfile, shutil, requests, base64, time, zipfile, zlib, struct
+import xml.etree.ElementTree as ET
+from python_multipart.multipart import MultipartParser, parse_options_header
+from python_multipart.exceptions import MultipartParseError
 from openai import OpenAI
 from dotenv import load_dotenv
 import pandas as pd
@@ -45,50 +49,74 @@ class SummaryResponse(BaseModel):
     summary: str
 
 # File processing utilities
-EXT_REGEX = re.compile(r"\.(png|jpe?g|pdf|xlsx?|xls)", re.IGNORECASE)
+# Extension is only used to name saved files; the format itself is sniffed from content
+EXT_REGEX = re.compile(r"\.(png|jpe?g|pdf|xlsx?|xls|docx|zip|csv|txt)", re.IGNORECASE)
+
+# Multipart upload limits (bytes unless noted)
+MAX_UPLOAD_FILE_SIZE = int(os.getenv("EVIDENCE_MAX_FILE_SIZE", 25 * 1024 * 1024))
+MAX_UPLOAD_FILES = int(os.getenv("EVIDENCE_MAX_FILES", 20))
+MAX_FORM_FIELD_SIZE = 1024 * 1024
+MAX_FORM_FIELDS = int(os.getenv("EVIDENCE_MAX_FORM_FIELDS", 10))
+MAX_PART_HEADER_SIZE = 16 * 1024
+# Whole request body: every file and field at its limit, plus room for part headers and boundaries
+MAX_UPLOAD_BODY_SIZE = (MAX_UPLOAD_FILES * MAX_UPLOAD_FILE_SIZE + MAX_FORM_FIELDS * MAX_FORM_FIELD_SIZE
+                        + (MAX_UPLOAD_FILES + MAX_FORM_FIELDS) * MAX_PART_HEADER_SIZE)
+# File parts below this size stay in memory, larger ones roll over to their destination file
+SPOOL_MAX_SIZE = int(os.getenv("EVIDENCE_SPOOL_MAX_SIZE", 1024 * 1024))
+
+def infer_ext(name: str, content_type: str) -> str:
+    """Infer evidence extension from a URL/filename, falling back to content-type"""
+    # Try regex first
+    m = EXT_REGEX.search(name)
+    if m:
+        return m.group(1).lower()
+    # fallback to content-type
+    ct = content_type or ""
+    if "pdf" in ct: return "pdf"
+    elif "spreadsheet" in ct or "excel" in ct: return "xlsx"
+    elif "image/jpeg" in ct: return "jpeg"
+    elif "image/png" in ct: return "png"
+    elif "wordprocessingml" in ct: return "docx"
+    elif "zip" in ct: return "zip"
+    elif "text/csv" in ct: return "csv"
+    elif "text/plain" in ct: return "txt"
+    return "bin"
 
 def download_s3_url(url: str, dest_dir: str) -> Tuple[str,str]:
     """Download file, infer extension, save, return (local_path, ext)"""
     r = requests.get(url, stream=True)
     if r.status_code != 200:
         raise HTTPException(400, f"Failed to download {url}")
-    # Try regex first
-    m = EXT_REGEX.search(url)
-    ext = m.group(1).lower() if m else None
-    if not ext:
-        # fallback to content-type
-        ct = r.headers.get("Content-Type","")
-        if "pdf" in ct: ext="pdf"
-        elif "spreadsheet" in ct or "excel" in ct: ext="xlsx"
-        elif "image/jpeg" in ct: ext="jpeg"
-        elif "image/png" in ct: ext="png"
-        else: ext="bin"
+    ext = infer_ext(url, r.headers.get("Content-Type",""))
     fname = f"{uuid.uuid4().hex}.{ext}"
     path = os.path.join(dest_dir, fname)
     with open(path,"wb") as f:
         for chunk in r.iter_content(1024*32): f.write(chunk)
     return path, ext
 
-def process_image(fp: str) -> Tuple[str, str]:
-    ext = os.path.splitext(fp)[1].lower()
-    mime = "image/jpeg" if ext in ('.jpg', '.jpeg') else "image/png"
+def process_image(fp: str, mime: Optional[str] = None) -> Tuple[str, str]:
+    if mime is None:
+        ext = os.path.splitext(fp)[1].lower()
+        mime = "image/jpeg" if ext in ('.jpg', '.jpeg') else "image/png"
     data = base64.b64encode(open(fp, "rb").read()).decode()
     return mime, data
 
-def process_excel(fp: str) -> str:
-    xls = pd.ExcelFile(fp, engine='openpyxl')
+def process_excel(fp: str, engine: Optional[str] = 'openpyxl') -> str:
+    xls = pd.ExcelFile(fp, engine=engine)
     out = []
     for name in xls.sheet_names:
         df = xls.parse(name)
         out.append(f"Sheet: {name}\n{df.to_string()}")
     return "\n\n".join(out)
 
-def process_pdf(fp: str) -> Tuple[str, List[str]]:
+def process_pdf(fp: str, max_images: Optional[int] = None) -> Tuple[str, List[str]]:
     doc = fitz.open(fp)
     txt = "".join(page.get_text() for page in doc)
     imgs = []
     for page in doc:
         for imginfo in page.get_images(full=True):
+            if max_images is not None and len(imgs) >= max_images:
+                break
             xref = imginfo[0]
             pix = fitz.Pixmap(doc, xref)
             if pix.width > 300 and pix.height > 300:
@@ -98,26 +126,302 @@ def process_pdf(fp: str) -> Tuple[str, List[str]]:
             pix = None
     return txt, imgs
 
-def process_files(paths: List[str]) -> Tuple[str, List[Tuple[str, str]]]:
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+def process_docx(fp: str) -> str:
+    """Extract paragraph text from word/document.xml without loading the whole XML tree"""
+    paras = []
+    buf = []
+    with zipfile.ZipFile(fp) as zf, zf.open("word/document.xml") as doc:
+        for _, el in ET.iterparse(doc, events=("end",)):
+            if el.tag == W_NS + "t":
+                buf.append(el.text or "")
+            elif el.tag == W_NS + "tab":
+                buf.append("\t")
+            elif el.tag == W_NS + "p":
+                paras.append("".join(buf))
+                buf = []
+                el.clear()
+    return "\n".join(paras)
+
+UTF16_BOMS = (b"\xff\xfe", b"\xfe\xff")
+
+def process_text(fp: str, max_chars: Optional[int] = None) -> str:
+    """Read a text export, falling back to cp1252 for non-UTF-8 (e.g. Windows Excel) files.
+
+    With `max_chars`, only enough bytes for that many characters are read.
+    """
+    with open(fp, "rb") as f:
+        raw = f.read(max_chars * 4 if max_chars is not None else -1)
+    if raw.startswith(UTF16_BOMS):
+        return raw.decode("utf-16", errors="replace")
+    try:
+        return raw.decode("utf-8-sig")
+    except UnicodeDecodeError as e:
+        # The read limit may cut a multi-byte character at the end
+        if e.start >= len(raw) - 3:
+            return raw[:e.start].decode("utf-8-sig")
+        return raw.decode("cp1252", errors="replace")
+
+def truncate_text(text: str, limit: int, label: str) -> str:
+    """Cut `text` to `limit` characters, leaving a marker like the archive truncation notes"""
+    if len(text) <= limit:
+        return text
+    return text[:max(limit, 0)] + f"\n[Text truncated for {label}: character limit reached]\n"
+
+# Evidence format registry
+# Each entry is (name, sniff, handler). `sniff(head, path)` inspects the first
+# SNIFF_BYTES of the file; `handler(path, label, depth, budget)` returns (text, images).
+# Entries are tried in registration order, so more specific formats come first.
+FormatSniffer = Callable[[bytes, str], bool]
+FormatHandler = Callable[[str, str, int, "ParseBudget"], Tuple[str, List[Tuple[str, str]]]]
+FORMAT_HANDLERS: List[Tuple[str, FormatSniffer, FormatHandler]] = []
+SNIFF_BYTES = 8192
+
+# Archive expansion limits
+MAX_ARCHIVE_MEMBERS = int(os.getenv("EVIDENCE_MAX_ARCHIVE_MEMBERS", 200))
+MAX_ARCHIVE_UNCOMPRESSED_SIZE = int(os.getenv("EVIDENCE_MAX_ARCHIVE_SIZE", 200 * 1024 * 1024))
+MAX_ARCHIVE_DEPTH = int(os.getenv("EVIDENCE_MAX_ARCHIVE_DEPTH", 2))
+# Extracted text limits: per top-level file (archive members included) and per request
+MAX_FILE_TEXT_CHARS = int(os.getenv("EVIDENCE_MAX_FILE_TEXT", 100_000))
+MAX_EVIDENCE_TEXT_CHARS = int(os.getenv("EVIDENCE_MAX_TEXT", 300_000))
+# Embedded PDF images are sent to the model, so keep the count per PDF small
+MAX_PDF_IMAGES = int(os.getenv("EVIDENCE_MAX_PDF_IMAGES", 5))
+
+class ParseBudget:
+    """Resources used so far by one top-level evidence file and everything nested in it.
+
+    Tracks archive members, uncompressed bytes, extracted text characters and parse
+    seconds. A single budget is shared with every nested archive, so nesting cannot
+    reset the limits.
+    """
+
+    def __init__(self):
+        self.members = 0
+        self.bytes = 0
+        self.chars = 0
+        self.seconds = 0.0
+
+    def members_exhausted(self) -> bool:
+        return self.members >= MAX_ARCHIVE_MEMBERS
+
+    def bytes_exhausted(self) -> bool:
+        return self.bytes > MAX_ARCHIVE_UNCOMPRESSED_SIZE
+
+    def text_exhausted(self) -> bool:
+        return self.chars >= MAX_FILE_TEXT_CHARS
+
+def register_format(name: str, sniff: FormatSniffer):
+    """Decorator adding a handler to FORMAT_HANDLERS"""
+    def decorator(handler: FormatHandler) -> FormatHandler:
+        FORMAT_HANDLERS.append((name, sniff, handler))
+        return handler
+    return decorator
+
+def _is_zip(head: bytes) -> bool:
+    return head.startswith(b"PK\x03\x04")
+
+def _zip_has_member(path: str, member: str) -> bool:
+    try:
+        with zipfile.ZipFile(path) as zf:
+            return member in zf.namelist()
+    except zipfile.BadZipFile:
+        return False
+
+OLE2_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+
+def _is_xls_workbook(head: bytes, path: str) -> bool:
+    """OLE2 also wraps .doc/.ppt/.msg and encrypted OOXML; only claim files with a Workbook/Book stream"""
+    if not head.startswith(OLE2_MAGIC) or len(head) < 512:
+        return False
+    sector_shift = struct.unpack_from("<H", head, 0x1E)[0]
+    if sector_shift not in (9, 12):
+        return False
+    sector_size = 1 << sector_shift
+    dir_sector = struct.unpack_from("<I", head, 0x30)[0]
+    # Workbook streams sit in the first directory sector in practice, so the FAT chain is not followed
+    with open(path, "rb") as f:
+        f.seek((dir_sector + 1) * sector_size)
+        directory = f.read(sector_size)
+    for off in range(0, len(directory) - 127, 128):
+        name_len = struct.unpack_from("<H", directory, off + 0x40)[0]
+        name = directory[off:off + min(max(name_len - 2, 0), 62)].decode("utf-16-le", errors="ignore")
+        if name in ("Workbook", "Book"):
+            return True
+    return False
+
+def _is_binary(head: bytes) -> bool:
+    # NUL bytes mean binary content unless the file is BOM-marked UTF-16
+    return b"\x00" in head and not head.startswith(UTF16_BOMS)
+
+def _is_text(head: bytes) -> bool:
+    if not head or _is_binary(head):
+        return False
+    if head.startswith(UTF16_BOMS):
+        return True
+    try:
+        head.decode("utf-8")
+        return True
+    except UnicodeDecodeError as e:
+        # A multi-byte character may be cut off at the end of the sniffed block
+        if e.start >= len(head) - 3:
+            return True
+    # Legacy single-byte encodings (cp1252 etc.): accept if control characters are rare
+    controls = sum(1 for b in head if b < 32 and b not in b"\t\n\r\x0c")
+    return controls <= len(head) // 100
+
+@register_format("png", lambda head, path: head.startswith(b"\x89PNG\r\n\x1a\n"))
+def handle_png(path: str, label: str, depth: int, budget: ParseBudget):
+    return "", [process_image(path, "image/png")]
+
+@register_format("jpeg", lambda head, path: head.startswith(b"\xff\xd8\xff"))
+def handle_jpeg(path: str, label: str, depth: int, budget: ParseBudget):
+    return "", [process_image(path, "image/jpeg")]
+
+@register_format("pdf", lambda head, path: b"%PDF-" in head[:1024])
+def handle_pdf(path: str, label: str, depth: int, budget: ParseBudget):
+    pdf_txt, pdf_imgs = process_pdf(path, MAX_PDF_IMAGES)
+    return f"\n\n--- PDF {label} ---\n" + pdf_txt, [process_image(ip) for ip in pdf_imgs]
+
+@register_format("xlsx", lambda head, path: _is_zip(head) and _zip_has_member(path, "xl/workbook.xml"))
+def handle_xlsx(path: str, label: str, depth: int, budget: ParseBudget):
+    return f"\n\n--- EXCEL {label} ---\n" + process_excel(path), []
+
+@register_format("xls", _is_xls_workbook)
+def handle_xls(path: str, label: str, depth: int, budget: ParseBudget):
+    # Legacy OLE2 workbooks need pandas' default (xlrd) engine
+    return f"\n\n--- EXCEL {label} ---\n" + process_excel(path, engine=None), []
+
+@register_format("docx", lambda head, path: _is_zip(head) and _zip_has_member(path, "word/document.xml"))
+def handle_docx(path: str, label: str, depth: int, budget: ParseBudget):
+    return f"\n\n--- DOCX {label} ---\n" + process_docx(path), []
+
+@register_format("zip", lambda head, path: _is_zip(head))
+def handle_zip(path: str, label: str, depth: int, budget: ParseBudget):
+    """Expand a ZIP archive one member at a time, enforcing the archive limits.
+
+    Each member is streamed to its own temp directory, parsed via process_file and
+    removed before the next one, so the archive is never extracted as a whole.
+    """
+    if depth >= MAX_ARCHIVE_DEPTH:
+        print(f"Skipping {label}: archive nesting exceeds {MAX_ARCHIVE_DEPTH}")
+        return "", []
+    text = f"\n\n--- ZIP {label} ---\n"
+    images = []
+    with zipfile.ZipFile(path) as zf:
+        for info in zf.infolist():
+            if info.is_dir():
+                continue
+            # Limits are shared with enclosing archives, which may have used them up
+            if budget.text_exhausted():
+                print(f"{label}: extracted text limit ({MAX_FILE_TEXT_CHARS} chars) reached, stopping at {info.filename}")
+                text += f"[Archive truncated at {info.filename}: text limit reached]\n"
+                break
+            if budget.bytes_exhausted():
+                text += f"[Archive truncated at {info.filename}: uncompressed size limit reached]\n"
+                break
+            if budget.members_exhausted():
+                print(f"{label}: archive member limit ({MAX_ARCHIVE_MEMBERS}) reached, stopping at {info.filename}")
+                text += f"[Archive truncated at {info.filename}: member limit reached]\n"
+                break
+            budget.members += 1
+            member_label = f"{label}/{info.filename}"
+            # basename() keeps "../" style member names inside member_dir
+            member_name = os.path.basename(info.filename)
+            if member_name in ("", ".", ".."):
+                print(f"Skipping {member_label}: unusable member name")
+                continue
+            with tempfile.TemporaryDirectory(dir=os.path.dirname(path)) as member_dir:
+                member_path = os.path.join(member_dir, member_name)
+                try:
+                    with zf.open(info) as src, open(member_path, "wb") as dst:
+                        # Count actual bytes rather than trusting the header's file_size
+                        for chunk in iter(lambda: src.read(1024*32), b""):
+                            budget.bytes += len(chunk)
+                            if budget.bytes_exhausted():
+                                break
+                            dst.write(chunk)
+                except (RuntimeError, zipfile.BadZipFile, NotImplementedError, OSError, zlib.error, EOFError) as e:
+                    print(f"Failed to extract {member_label}: {e}")
+                    continue
+                if budget.bytes_exhausted():
+                    print(f"{label}: uncompressed size exceeds {MAX_ARCHIVE_UNCOMPRESSED_SIZE} bytes, stopping at {info.filename}")
+                    text += f"[Archive truncated at {info.filename}: uncompressed size limit reached]\n"
+                    break
+                member_text, member_images = process_file(member_path, member_label, depth + 1, budget)
+                text += member_text
+                images += member_images
+    return text, images
+
+# CSV exports may be in any encoding, so only reject clearly binary content
+@register_format("csv", lambda head, path: path.lower().endswith(".csv") and bool(head) and not _is_binary(head))
+def handle_csv(path: str, label: str, depth: int, budget: ParseBudget):
+    return f"\n\n--- CSV {label} ---\n" + process_text(path, MAX_FILE_TEXT_CHARS), []
+
+@register_format("text", lambda head, path: _is_text(head))
+def handle_text(path: str, label: str, depth: int, budget: ParseBudget):
+    return f"\n\n--- TEXT {label} ---\n" + process_text(path, MAX_FILE_TEXT_CHARS), []
+
+def sniff_format(path: str) -> Optional[Tuple[str, FormatHandler]]:
+    """Return (format_name, handler) for the first registered format matching the file's magic bytes"""
+    with open(path, "rb") as f:
+        head = f.read(SNIFF_BYTES)
+    for name, sniff, handler in FORMAT_HANDLERS:
+        if sniff(head, path):
+            return name, handler
+    return None
+
+def process_file(path: str, label: Optional[str] = None, depth: int = 0,
+                 budget: Optional[ParseBudget] = None) -> Tuple[str, List[Tuple[str, str]]]:
+    """Sniff a single evidence file, dispatch it to its format handler and log the parse time.
+
+    Top-level calls start a fresh ParseBudget; nested archive members share their parent's.
+    Extracted text is capped at MAX_FILE_TEXT_CHARS per top-level file. The logged time
+    excludes nested members, which log their own.
+    """
+    label = label or os.path.basename(path)
+    budget = budget or ParseBudget()
+    match = sniff_format(path)
+    if match is None:
+        print(f"Skipping {label}: unrecognised evidence format")
+        return "", []
+    fmt, handler = match
+    chars_before = budget.chars
+    seconds_before = budget.seconds
+    start = time.perf_counter()
+    try:
+        text, images = handler(path, label, depth, budget)
+    except Exception as e:
+        elapsed = time.perf_counter() - start
+        budget.seconds = seconds_before + elapsed
+        print(f"Failed to parse {label} as {fmt} after {elapsed * 1000:.1f} ms: {e}")
+        return "", []
+    elapsed = time.perf_counter() - start
+    nested = budget.seconds - seconds_before
+    budget.seconds = seconds_before + elapsed
+    text = truncate_text(text, MAX_FILE_TEXT_CHARS - chars_before, label)
+    budget.chars = chars_before + len(text)
+    if nested:
+        print(f"Parsed {label} as {fmt} in {(elapsed - nested) * 1000:.1f} ms (+{nested * 1000:.1f} ms in members)")
+    else:
+        print(f"Parsed {label} as {fmt} in {elapsed * 1000:.1f} ms")
+    return text, images
+
+def process_files(paths: List[str], labels: Optional[List[str]] = None) -> Tuple[str, List[Tuple[str, str]]]:
+    """Parse local evidence files; `labels` are the names used in each section header"""
     text = ""
     images = []
-    for p in list(paths):
-        low = p.lower()
-        if low.endswith(('.png', '.jpg', '.jpeg')):
-            images.append(process_image(p))
-        elif low.endswith(('.xls', '.xlsx')):
-            text += f"\n\n--- EXCEL {os.path.basename(p)} ---\n"
-            text += process_excel(p)
-        elif low.endswith('.pdf'):
-            text += f"\n\n--- PDF {os.path.basename(p)} ---\n"
-            pdf_txt, pdf_imgs = process_pdf(p)
-            text += pdf_txt
-            for ip in pdf_imgs:
-                paths.append(ip)
+    for i, p in enumerate(paths):
+        file_text, file_images = process_file(p, labels[i] if labels and i < len(labels) else None)
+        text += file_text
+        images += file_images
     return text, images
 
-def process_evidence_files(evidence_urls: List[str]) -> Tuple[str, List[Tuple[str, str]]]:
-    """Process evidence files from URLs and return extracted text and images"""
+def process_evidence_files(evidence_urls: List[str], names: Optional[List[str]] = None) -> Tuple[str, List[Tuple[str, str]]]:
+    """Process evidence files from URLs and return extracted text and images.
+
+    `names` are the display names listed in the evidence manifest, used as section labels.
+    """
     if not evidence_urls:
         return "", []
     
@@ -127,26 +431,196 @@ def process_evidence_files(evidence_urls: List[str]) -> Tuple[str, List[Tuple[st
     
     try:
         local_paths = []
-        for url in evidence_urls:
+        labels = []
+        for i, url in enumerate(evidence_urls):
             try:
                 path, ext = download_s3_url(url, temp_dir)
                 local_paths.append(path)
+                labels.append(names[i] if names and i < len(names) else os.path.basename(path))
             except Exception as e:
                 print(f"Failed to download {url}: {e}")
                 continue
 
         # Process all downloaded files
-        text, images = process_files(local_paths)
+        text, images = process_files(local_paths, labels)
         return text, images
     finally:
         # Cleanup temporary directory
         if os.path.exists(temp_dir):
             shutil.rmtree(temp_dir, ignore_errors=True)
-        
-    
 
-@app.post("/generate_summary", response_model=SummaryResponse)
-async def generate_summary(request: GenerateSummaryRequest):
+class EvidenceUpload:
+    """Streams multipart parts to disk, enforcing per-file and per-field limits.
+
+    File parts are buffered in memory up to SPOOL_MAX_SIZE and then roll over to
+    their destination file under `dest_dir`, so every byte is written to disk once.
+    Form fields are collected into `fields`; saved files are recorded in `files`
+    as (local_path, original_filename).
+    """
+
+    def __init__(self, dest_dir: str):
+        self.dest_dir = dest_dir
+        self.fields: Dict[str, str] = {}
+        self.files: List[Tuple[str, str]] = []
+        self._field_count = 0
+        self._reset_part()
+
+    def _reset_part(self):
+        self._header_field = b""
+        self._header_value = b""
+        self._header_size = 0
+        self._headers: Dict[bytes, bytes] = {}
+        self._name = ""
+        self._filename: Optional[str] = None
+        self._path: Optional[str] = None
+        self._file = None
+        self._data = bytearray()
+        self._size = 0
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self._reset_part,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+        }
+
+    def _count_header(self, size: int):
+        self._header_size += size
+        if self._header_size > MAX_PART_HEADER_SIZE:
+            raise HTTPException(413, f"Part headers exceed {MAX_PART_HEADER_SIZE} bytes")
+
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self._count_header(end - start)
+        self._header_field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self._count_header(end - start)
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        self._name = options.get(b"name", b"").decode("utf-8", errors="replace")
+        if b"filename" in options:
+            if len(self.files) >= MAX_UPLOAD_FILES:
+                raise HTTPException(413, f"Too many evidence files (max {MAX_UPLOAD_FILES})")
+            self._filename = os.path.basename(options[b"filename"].decode("utf-8", errors="replace"))
+            ct = self._headers.get(b"content-type", b"").decode("latin-1")
+            ext = infer_ext(self._filename, ct)
+            self._path = os.path.join(self.dest_dir, f"{uuid.uuid4().hex}.{ext}")
+        else:
+            self._field_count += 1
+            if self._field_count > MAX_FORM_FIELDS:
+                raise HTTPException(413, f"Too many form fields (max {MAX_FORM_FIELDS})")
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        self._size += end - start
+        if self._path is not None:
+            if self._size > MAX_UPLOAD_FILE_SIZE:
+                raise HTTPException(413, f"Evidence file {self._filename} exceeds {MAX_UPLOAD_FILE_SIZE} bytes")
+            if self._file is None and self._size > SPOOL_MAX_SIZE:
+                # Roll over: flush what is buffered, then write straight through
+                self._file = open(self._path, "wb")
+                self._file.write(self._data)
+                self._data = bytearray()
+            if self._file is not None:
+                self._file.write(data[start:end])
+                return
+        elif self._size > MAX_FORM_FIELD_SIZE:
+            raise HTTPException(413, f"Form field {self._name} exceeds {MAX_FORM_FIELD_SIZE} bytes")
+        self._data += data[start:end]
+
+    def on_part_end(self):
+        if self._path is None:
+            try:
+                self.fields[self._name] = self._data.decode("utf-8")
+            except UnicodeDecodeError:
+                raise HTTPException(400, f"Form field {self._name} is not valid UTF-8")
+            return
+        if self._file is None:
+            if not self._filename or self._size == 0:
+                return
+            with open(self._path, "wb") as f:
+                f.write(self._data)
+        else:
+            self.close()
+        self.files.append((self._path, self._filename))
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+PARSER_FEED_SIZE = 64 * 1024
+
+def _feed_parser(parser: MultipartParser, chunk: bytes):
+    # Header callbacks only fire at the end of each write, so bound the slice the
+    # parser scans before MAX_PART_HEADER_SIZE can be checked
+    for i in range(0, len(chunk), PARSER_FEED_SIZE):
+        parser.write(chunk[i:i + PARSER_FEED_SIZE])
+
+async def receive_evidence_upload(http_request: Request, dest_dir: str) -> EvidenceUpload:
+    """Stream a multipart/form-data body into `dest_dir` without buffering it whole.
+
+    Chunks are read on the event loop; parsing and the disk writes in the parser
+    callbacks run in the threadpool.
+    """
+    content_type, params = parse_options_header(http_request.headers.get("Content-Type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(415, "Expected multipart/form-data with a boundary")
+
+    upload = EvidenceUpload(dest_dir)
+    parser = MultipartParser(boundary, upload.callbacks(), max_size=MAX_UPLOAD_BODY_SIZE)
+    received = 0
+    try:
+        async for chunk in http_request.stream():
+            # Checked here as the parser's max_size silently truncates instead of failing
+            received += len(chunk)
+            if received > MAX_UPLOAD_BODY_SIZE:
+                raise HTTPException(413, f"Request body exceeds {MAX_UPLOAD_BODY_SIZE} bytes")
+            await run_in_threadpool(_feed_parser, parser, chunk)
+        parser.finalize()
+    except MultipartParseError as e:
+        raise HTTPException(400, f"Malformed multipart body: {e}")
+    finally:
+        upload.close()
+    return upload
+
+def evidence_display_names(request: GenerateSummaryRequest) -> List[str]:
+    """Names shown in the evidence manifest for each evidence URL"""
+    urls = request.evidence_urls or []
+    return [
+        request.evidence_names[i] if (request.evidence_names and i < len(request.evidence_names)) else os.path.basename(urls[i]).split('?')[0]
+        for i in range(len(urls))
+    ]
+
+def build_evidence_manifest(names: List[str]) -> str:
+    return "\n\n## EVIDENCE FILES:\n" + "\n".join(
+        [f"- [{i+1}] {name}" for i, name in enumerate(names)]
+    )
+
+# Only a preview of the extracted evidence is logged
+EVIDENCE_LOG_CHARS = 1000
+
+def prepare_summary_inputs(request: GenerateSummaryRequest, uploads: Optional[List[Tuple[str, str]]] = None) -> Tuple[str, str, str, List[Tuple[str, str]]]:
+    """Build the questionnaire and evidence sections of the prompt.
+
+    `uploads` holds (local_path, display_name) pairs for files already on disk; they
+    are listed after any URL evidence. Returns (questionnaire, evidence_context,
+    evidence_manifest, evidence_images) as expected by summarize().
+    """
+    urls = request.evidence_urls or []
+    uploads = uploads or []
+
     # Step 1: Build questionnaire from request
     print("Received request:", request.qas)
     questionnaire = "\n".join(
@@ -157,26 +631,65 @@ async def generate_summary(request: GenerateSummaryRequest):
     evidence_context = ""
     evidence_images = []
     evidence_manifest = ""
-    
-    if request.evidence_urls:
-        evidence_manifest = "\n\n## EVIDENCE FILES:\n" + "\n".join(
-        [
-            f"- [{i+1}] {request.evidence_names[i] if (request.evidence_names and i < len(request.evidence_names)) else os.path.basename(request.evidence_urls[i]).split('?')[0]}"
-            for i in range(len(request.evidence_urls))
-        ]
-    )
-        print(f"Processing {len(request.evidence_urls)} evidence files...")
-        print(f"Evidence URLs:{evidence_manifest}")
+
+    names = evidence_display_names(request) + [name for _, name in uploads]
+    if names:
+        evidence_manifest = build_evidence_manifest(names)
+        print(f"Processing {len(urls)} evidence URLs and {len(uploads)} uploaded files...")
+        print(f"Evidence files:{evidence_manifest}")
         try:
-            evidence_text, evidence_images = process_evidence_files(request.evidence_urls)
+            evidence_text, evidence_images = process_evidence_files(urls, evidence_display_names(request))
+            if uploads:
+                upload_text, upload_images = process_files([path for path, _ in uploads], [name for _, name in uploads])
+                evidence_text += upload_text
+                evidence_images += upload_images
+            evidence_text = truncate_text(evidence_text, MAX_EVIDENCE_TEXT_CHARS, "evidence documentation")
             if evidence_text:
                 evidence_context = f"\n\n## EVIDENCE DOCUMENTATION:\n{evidence_text}"
-            print(f"Evidence : {evidence_text}")
+            print(f"Evidence : {evidence_text[:EVIDENCE_LOG_CHARS]}")
             print(f"Extracted evidence: {len(evidence_text)} chars text, {len(evidence_images)} images")
         except Exception as e:
             print(f"Error processing evidence files: {e}")
             evidence_context = "\n\n## EVIDENCE DOCUMENTATION:\n[Error processing evidence files]"
 
+    return questionnaire, evidence_context, evidence_manifest, evidence_images
+
+
+@app.post("/generate_summary", response_model=SummaryResponse)
+async def generate_summary(request: GenerateSummaryRequest):
+    # Evidence parsing and the OpenAI call block, so keep them off the event loop
+    inputs = await run_in_threadpool(prepare_summary_inputs, request)
+    return await run_in_threadpool(summarize, request, *inputs)
+
+@app.post("/generate_summary/upload", response_model=SummaryResponse)
+async def generate_summary_upload(http_request: Request):
+    """Multipart variant of /generate_summary.
+
+    Expects a `payload` form field holding the GenerateSummaryRequest JSON plus any
+    number of file parts, which are streamed to disk and parsed directly instead of
+    being fetched from pre-signed URLs.
+    """
+    temp_dir = os.path.join(tempfile.gettempdir(), "evidence_" + uuid.uuid4().hex)
+    os.makedirs(temp_dir, exist_ok=True)
+
+    try:
+        upload = await receive_evidence_upload(http_request, temp_dir)
+        if "payload" not in upload.fields:
+            raise HTTPException(422, "Missing 'payload' form field")
+        try:
+            request = GenerateSummaryRequest.model_validate_json(upload.fields["payload"])
+        except ValidationError as e:
+            raise HTTPException(422, e.errors())
+
+        # Parse uploads before temp_dir is removed
+        inputs = await run_in_threadpool(prepare_summary_inputs, request, upload.files)
+    finally:
+        await run_in_threadpool(shutil.rmtree, temp_dir, ignore_errors=True)
+
+    return await run_in_threadpool(summarize, request, *inputs)
+
+def summarize(request: GenerateSummaryRequest, questionnaire: str, evidence_context: str,
+              evidence_manifest: str, evidence_images: List[Tuple[str, str]]) -> SummaryResponse:
     # Step 3: Check for example in example_dict
     example = example_dict.get((request.control_id, request.asset_type))
 